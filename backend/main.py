@@ -1,9 +1,20 @@
 from __future__ import annotations
 
+import functools
+import gzip
+import itertools
 import json
 import math
+import operator
+import queue
 import re
 import sqlite3
+import threading
+import time
+import zlib
+from collections.abc import Callable, Iterable
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from datetime import datetime, timedelta, timezone
 from difflib import SequenceMatcher
 from pathlib import Path
@@ -14,10 +25,17 @@ from urllib.request import Request, urlopen
 
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 DB_PATH = Path(__file__).resolve().parent / "triage.db"
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-20000",
+    "PRAGMA mmap_size=268435456",
+)
 USER_AGENT = "ai-hospital-hackathon/1.0"
 
 NOMINATIM_SEARCH_URL = "https://nominatim.openstreetmap.org/search"
@@ -26,7 +44,19 @@ OSRM_TABLE_URL = "https://router.project-osrm.org/table/v1/driving"
 HHS_BED_DATA_URL = "https://healthdata.gov/resource/anag-cw7u.json"
 POLLINATIONS_TEXT_URL = "https://text.pollinations.ai/"
 
+GEOCODE_CACHE_TTL_SECONDS = 3600
+LATEST_WEEK_CACHE_TTL_SECONDS = 86400
+NEARBY_HOSPITALS_CACHE_TTL_SECONDS = 3600
+BED_CAPACITY_CACHE_TTL_SECONDS = 3600
+LATEST_PREDICTION_CACHE_TTL_SECONDS = 5
+HOSPITAL_DEDUPE_GRID_DECIMALS = 3
+MOVE_PRIORITY_CACHE_MAXSIZE = 4096
+
 MOVE_LABELS = ["ICU_ADMISSION", "IN_TREATMENT", "REFERRED", "OBSERVATION", "DISCHARGED"]
+MOVE_LABEL_INDEX = {label: index for index, label in enumerate(MOVE_LABELS)}
+PRIORITY_LEVELS = ("P1 - CRITICAL", "P2 - HIGH", "P3 - MEDIUM", "P4 - LOW")
+PRIORITY_RANK_BY_MOVE = {"ICU_ADMISSION": 0, "IN_TREATMENT": 1, "REFERRED": 1, "OBSERVATION": 2, "DISCHARGED": 3}
+PRIORITY_RANK_BY_RISK_BAND = (3, 3, 2, 1, 0, 0)
 
 AGE_RANGE = (0, 120)
 HEART_RATE_RANGE = (20, 240)
@@ -89,6 +119,7 @@ STATE_TO_CODE = {
     "WISCONSIN": "WI",
     "WYOMING": "WY",
 }
+STATE_CODES = frozenset(STATE_TO_CODE.values())
 
 SEED_OUTCOME_DATA = [
     {"age": 79, "rural": 1, "heart_rate": 132, "systolic_bp": 82, "spo2": 84.0, "temperature": 39.2, "risk_score": 100, "outcome": "ICU_ADMISSION"},
@@ -155,6 +186,8 @@ INDIA_HOSPITAL_CAPACITY_PRIORS = [
     {"hospital_id": "IN-CHD-PGIMER", "hospital_name": "PGIMER Chandigarh", "city": "CHANDIGARH", "available_icu_beds": 14, "available_inpatient_beds": 108},
 ]
 
+INDIA_PRIORS_COLLECTION_WEEK = "synthetic_prior_2026-02-25"
+
 SYMPTOM_KEYWORDS = {
     "symptom_respiratory": ["shortness of breath", "breathlessness", "dyspnea", "wheezing", "low oxygen"],
     "symptom_chest_pain": ["chest pain", "chest pressure", "tightness", "angina"],
@@ -164,19 +197,66 @@ SYMPTOM_KEYWORDS = {
     "symptom_dehydration": ["vomiting", "diarrhea", "dehydration", "dry mouth"],
 }
 
-COMMON_HOSPITAL_WORDS = {
-    "hospital",
-    "medical",
-    "center",
-    "centre",
-    "health",
-    "clinic",
-    "the",
-    "of",
-    "and",
-    "inc",
-    "llc",
+# Keyword -> feature scanned in one pass. The lookahead tries every start position, but at each one
+# only the longest keyword matches, so no keyword may be a prefix of another feature's keyword.
+SYMPTOM_KEYWORD_TO_FEATURE = {
+    keyword: feature_name for feature_name, keywords in SYMPTOM_KEYWORDS.items() for keyword in keywords
 }
+assert not any(
+    longer != shorter
+    and longer.startswith(shorter)
+    and SYMPTOM_KEYWORD_TO_FEATURE[longer] != SYMPTOM_KEYWORD_TO_FEATURE[shorter]
+    for longer in SYMPTOM_KEYWORD_TO_FEATURE
+    for shorter in SYMPTOM_KEYWORD_TO_FEATURE
+), "a symptom keyword is a prefix of another feature's keyword"
+SYMPTOM_KEYWORD_PATTERN = re.compile(
+    "(?=("
+    + "|".join(re.escape(keyword) for keyword in sorted(SYMPTOM_KEYWORD_TO_FEATURE, key=len, reverse=True))
+    + "))"
+)
+
+HOSPITAL_NAME_STRIP_PATTERN = re.compile(r"[^a-z0-9\s]+")
+LATLON_PATTERN = re.compile(r"^\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)\s*$")
+AI_SENTENCE_SPLIT_PATTERN = re.compile(r"[.;]\s+")
+AI_LIST_PREFIX_PATTERN = re.compile(r"^\d+[.)]\s*")
+AI_REFUSAL_PATTERN = re.compile(r"cannot help|can't help|cant help|help with that|as an ai")
+
+FEATURE_NAMES = (
+    "risk_ge_80",
+    "risk_60_79",
+    "risk_40_59",
+    "spo2_low",
+    "bp_low",
+    "hr_high",
+    "hr_low",
+    "temp_high",
+    "temp_low",
+    "child_u2",
+    "child_u5",
+    "pediatric",
+    "elderly",
+    "very_elderly",
+    "rural",
+    "triage_red",
+    "triage_orange",
+    *SYMPTOM_KEYWORDS,
+)
+
+COMMON_HOSPITAL_WORDS = frozenset(
+    {
+        "hospital",
+        "medical",
+        "center",
+        "centre",
+        "health",
+        "clinic",
+        "the",
+        "of",
+        "and",
+        "inc",
+        "llc",
+    }
+)
 
 app = FastAPI(
     title="AI-Powered Golden Hour Triage System",
@@ -194,6 +274,8 @@ app.add_middleware(
 
 
 class Vitals(BaseModel):
+    model_config = ConfigDict(allow_inf_nan=False)
+
     heart_rate: int = Field(..., ge=HEART_RATE_RANGE[0], le=HEART_RATE_RANGE[1])
     systolic_bp: int = Field(..., ge=SYSTOLIC_BP_RANGE[0], le=SYSTOLIC_BP_RANGE[1])
     spo2: float = Field(..., ge=SPO2_RANGE[0], le=SPO2_RANGE[1])
@@ -217,12 +299,36 @@ def utc_now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
-def get_connection() -> sqlite3.Connection:
-    connection = sqlite3.connect(DB_PATH)
+# One long-lived connection per worker thread keeps SQLite's page cache warm across requests.
+SQLITE_CONNECTIONS: dict[int, sqlite3.Connection] = {}
+SQLITE_CONNECTIONS_LOCK = threading.Lock()
+
+
+def open_connection() -> sqlite3.Connection:
+    connection = sqlite3.connect(DB_PATH, check_same_thread=False)
     connection.row_factory = sqlite3.Row
+    for pragma in SQLITE_PRAGMAS:
+        connection.execute(pragma)
+    return connection
+
+
+def get_connection() -> sqlite3.Connection:
+    thread_id = threading.get_ident()
+    connection = SQLITE_CONNECTIONS.get(thread_id)
+    if connection is None:
+        connection = open_connection()
+        with SQLITE_CONNECTIONS_LOCK:
+            SQLITE_CONNECTIONS[thread_id] = connection
     return connection
 
 
+def close_connections() -> None:
+    with SQLITE_CONNECTIONS_LOCK:
+        for connection in SQLITE_CONNECTIONS.values():
+            connection.close()
+        SQLITE_CONNECTIONS.clear()
+
+
 def init_db() -> None:
     with get_connection() as connection:
         connection.execute(
@@ -247,38 +353,186 @@ def init_db() -> None:
             )
             """
         )
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_triage_records_patient_id ON triage_records (patient_id)"
+        )
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_triage_records_created_at ON triage_records (created_at)"
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS idx_triage_records_status ON triage_records (status)")
         connection.commit()
 
 
+# One statement text for every latest-row lookup so each connection's statement cache reuses it.
+LATEST_PATIENT_ROW_SQL = """
+SELECT age, rural, heart_rate, systolic_bp, spo2, temperature, risk_score, triage_category, symptoms_json
+FROM triage_records
+WHERE patient_id = ?
+ORDER BY id DESC
+LIMIT 1
+"""
+
+TRIAGE_INSERT_SQL = """
+INSERT INTO triage_records (
+    patient_id,
+    created_at,
+    age,
+    gender,
+    rural,
+    heart_rate,
+    systolic_bp,
+    spo2,
+    temperature,
+    symptoms_json,
+    risk_score,
+    deterioration_probability_60min,
+    triage_category,
+    action,
+    status
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+TRIAGE_INSERT_BATCH_SIZE = 16
+TRIAGE_INSERT_TIMEOUT_SECONDS = 10.0
+# None is the stop sentinel put by stop_triage_insert_writer().
+TRIAGE_INSERT_QUEUE: queue.SimpleQueue[tuple[tuple[Any, ...], Future[None]] | None] = queue.SimpleQueue()
+TRIAGE_INSERT_WRITER_LOCK = threading.Lock()
+TRIAGE_INSERT_WRITER: threading.Thread | None = None
+# Set by the shutdown hook so no writer is started once the connections are about to close.
+TRIAGE_INSERT_WRITER_STOPPING = False
+
+
+def commit_triage_insert_batch(batch: list[tuple[tuple[Any, ...], Future[None]]]) -> None:
+    errors: list[Exception | None] = [None] * len(batch)
+    try:
+        with get_connection() as connection:
+            connection.executemany(TRIAGE_INSERT_SQL, [values for values, _ in batch])
+            connection.commit()
+    except Exception:
+        # One bad row fails the whole executemany; retry row by row so only its own request sees the error.
+        for index, (values, _) in enumerate(batch):
+            try:
+                with get_connection() as connection:
+                    connection.execute(TRIAGE_INSERT_SQL, values)
+                    connection.commit()
+            except Exception as exc:
+                errors[index] = exc
+
+    if any(error is None for error in errors):
+        bump_training_data_version()
+    for (_, future), error in zip(batch, errors):
+        if error is None:
+            future.set_result(None)
+        else:
+            future.set_exception(error)
+
+
+# One writer thread drains whatever inserts are waiting and commits them together.
+def run_triage_insert_writer() -> None:
+    while True:
+        item = TRIAGE_INSERT_QUEUE.get()
+        if item is None:
+            return
+        batch = [item]
+        stopping = False
+        while len(batch) < TRIAGE_INSERT_BATCH_SIZE:
+            try:
+                item = TRIAGE_INSERT_QUEUE.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                stopping = True
+                break
+            batch.append(item)
+
+        # Requests that already gave up (503) cancelled their futures; those rows must not be written.
+        batch = [(values, future) for values, future in batch if future.set_running_or_notify_cancel()]
+        if batch:
+            try:
+                commit_triage_insert_batch(batch)
+            except Exception as exc:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+
+        if stopping:
+            return
+
+
+def insert_triage_record(values: tuple[Any, ...]) -> Future[None]:
+    global TRIAGE_INSERT_WRITER
+    future: Future[None] = Future()
+    with TRIAGE_INSERT_WRITER_LOCK:
+        if TRIAGE_INSERT_WRITER_STOPPING:
+            future.cancel()
+            return future
+        if TRIAGE_INSERT_WRITER is None or not TRIAGE_INSERT_WRITER.is_alive():
+            TRIAGE_INSERT_WRITER = threading.Thread(
+                target=run_triage_insert_writer, name="triage-insert-writer", daemon=True
+            )
+            TRIAGE_INSERT_WRITER.start()
+        TRIAGE_INSERT_QUEUE.put((values, future))
+    return future
+
+
+def stop_triage_insert_writer() -> None:
+    global TRIAGE_INSERT_WRITER, TRIAGE_INSERT_WRITER_STOPPING
+    with TRIAGE_INSERT_WRITER_LOCK:
+        TRIAGE_INSERT_WRITER_STOPPING = True
+        writer = TRIAGE_INSERT_WRITER
+        TRIAGE_INSERT_WRITER = None
+        if writer is not None and writer.is_alive():
+            TRIAGE_INSERT_QUEUE.put(None)
+    # No join timeout: the writer's connection must not be closed under an in-flight commit,
+    # and SQLite's busy timeout already bounds how long that commit can block.
+    if writer is not None:
+        writer.join()
+
+
 @app.on_event("startup")
 def startup() -> None:
+    global TRIAGE_INSERT_WRITER_STOPPING
     init_db()
+    with TRIAGE_INSERT_WRITER_LOCK:
+        TRIAGE_INSERT_WRITER_STOPPING = False
+
+
+@app.on_event("shutdown")
+def shutdown() -> None:
+    # The writer owns a per-thread connection, so it has to finish before connections are closed.
+    stop_triage_insert_writer()
+    close_connections()
+    HTTP_EXECUTOR.shutdown(wait=False, cancel_futures=True)
 
 
 def calculate_risk(vitals: Vitals, age: int) -> tuple[int, float]:
+    heart_rate = vitals.heart_rate
+    systolic_bp = vitals.systolic_bp
+    spo2 = vitals.spo2
+    temperature = vitals.temperature
+
     score = 0
-    if vitals.spo2 < 90:
+    if spo2 < 90:
         score += 30
-    if vitals.spo2 < 85:
-        score += 10
-    if vitals.systolic_bp < 90:
+        if spo2 < 85:
+            score += 10
+    if systolic_bp < 90:
         score += 25
-    if vitals.systolic_bp < 80:
-        score += 10
-    if vitals.heart_rate > 120:
+        if systolic_bp < 80:
+            score += 10
+    if heart_rate > 120:
         score += 20
-    if vitals.heart_rate < 50:
+    elif heart_rate < 50:
         score += 15
-    if vitals.temperature > 38.5:
+    if temperature > 38.5:
         score += 15
-    if vitals.temperature <= 35.0:
+    elif temperature <= 35.0:
         score += 15
-    if vitals.temperature < 35.0:
-        score += 20
-    if vitals.temperature <= 32.0:
-        score += 15
-    if vitals.temperature <= 30.5:
-        score += 20
+        if temperature < 35.0:
+            score += 20
+        if temperature <= 32.0:
+            score += 15
+            if temperature <= 30.5:
+                score += 20
 
     if age <= 2:
         score += 20
@@ -292,10 +546,11 @@ def calculate_risk(vitals: Vitals, age: int) -> tuple[int, float]:
     elif age > 65:
         score += 10
 
-    if age <= 5 and vitals.temperature <= 35.0:
-        score += 10
-    if age <= 5 and (vitals.spo2 < 94 or vitals.systolic_bp < 95):
-        score += 10
+    if age <= 5:
+        if temperature <= 35.0:
+            score += 10
+        if spo2 < 94 or systolic_bp < 95:
+            score += 10
 
     score = min(score, 100)
     probability = round(score / 100, 2)
@@ -306,7 +561,7 @@ def normalize_and_validate_symptoms(symptoms: list[str]) -> list[str]:
     cleaned: list[str] = []
     seen: set[str] = set()
     for symptom in symptoms:
-        normalized = " ".join(str(symptom).split()).strip()
+        normalized = " ".join(str(symptom).split())
         if not normalized:
             continue
         if len(normalized) > MAX_SYMPTOM_LENGTH:
@@ -317,35 +572,34 @@ def normalize_and_validate_symptoms(symptoms: list[str]) -> list[str]:
         dedupe_key = normalized.casefold()
         if dedupe_key in seen:
             continue
+        if len(cleaned) == MAX_SYMPTOMS:
+            raise HTTPException(status_code=422, detail=f"Provide at most {MAX_SYMPTOMS} symptoms.")
         seen.add(dedupe_key)
         cleaned.append(normalized)
-
-    if len(cleaned) > MAX_SYMPTOMS:
-        raise HTTPException(status_code=422, detail=f"Provide at most {MAX_SYMPTOMS} symptoms.")
     return cleaned
 
 
 def parse_symptoms_payload(raw_value: Any) -> list[str]:
     if raw_value is None:
         return []
-    if isinstance(raw_value, list):
-        return [str(item).strip() for item in raw_value if str(item).strip()]
     if isinstance(raw_value, str):
         try:
             parsed = json.loads(raw_value)
-            if isinstance(parsed, list):
-                return [str(item).strip() for item in parsed if str(item).strip()]
         except json.JSONDecodeError:
-            pass
-        return [part.strip() for part in raw_value.split(",") if part.strip()]
+            return [stripped for part in raw_value.split(",") if (stripped := part.strip())]
+        if not isinstance(parsed, list):
+            return [stripped for part in raw_value.split(",") if (stripped := part.strip())]
+        raw_value = parsed
+    if isinstance(raw_value, list):
+        return [stripped for item in raw_value if (stripped := str(item).strip())]
     return []
 
 
-def dedupe_text_items(items: list[str]) -> list[str]:
+def dedupe_text_items(items: Iterable[str], limit: int | None = None) -> list[str]:
     cleaned: list[str] = []
     seen: set[str] = set()
     for item in items:
-        normalized = " ".join(str(item).split()).strip()
+        normalized = " ".join(str(item).split())
         if not normalized:
             continue
         key = normalized.casefold()
@@ -353,34 +607,19 @@ def dedupe_text_items(items: list[str]) -> list[str]:
             continue
         seen.add(key)
         cleaned.append(normalized)
+        if len(cleaned) == limit:
+            break
     return cleaned
 
 
-def validate_numeric_ranges(patient: PatientInput) -> None:
-    def check(name: str, value: float, low: float, high: float) -> None:
-        if not math.isfinite(value) or value < low or value > high:
-            raise HTTPException(status_code=422, detail=f"{name} must be between {low} and {high}.")
-
-    check("Age", float(patient.age), AGE_RANGE[0], AGE_RANGE[1])
-    check("Heart rate", float(patient.vitals.heart_rate), HEART_RATE_RANGE[0], HEART_RATE_RANGE[1])
-    check("Systolic BP", float(patient.vitals.systolic_bp), SYSTOLIC_BP_RANGE[0], SYSTOLIC_BP_RANGE[1])
-    check("SpO2", float(patient.vitals.spo2), SPO2_RANGE[0], SPO2_RANGE[1])
-    check(
-        "Temperature",
-        float(patient.vitals.temperature),
-        TEMPERATURE_RANGE[0],
-        TEMPERATURE_RANGE[1],
-    )
-
-
-def compute_anomaly_insights(
-    *,
+@functools.lru_cache(maxsize=2048)
+def score_vital_anomalies(
     age: int,
     heart_rate: int,
     systolic_bp: int,
     spo2: float,
     temperature: float,
-) -> dict[str, Any]:
+) -> tuple[int, str, tuple[str, ...]]:
     score = 0.0
     watchouts: list[str] = []
 
@@ -433,10 +672,24 @@ def compute_anomaly_insights(
     if not watchouts:
         watchouts.append("No severe anomaly patterns detected in the latest vitals.")
 
+    return anomaly_score, anomaly_level, tuple(watchouts[:3])
+
+
+def compute_anomaly_insights(
+    *,
+    age: int,
+    heart_rate: int,
+    systolic_bp: int,
+    spo2: float,
+    temperature: float,
+) -> dict[str, Any]:
+    anomaly_score, anomaly_level, watchouts = score_vital_anomalies(
+        age, heart_rate, systolic_bp, spo2, temperature
+    )
     return {
         "anomaly_score": anomaly_score,
         "anomaly_level": anomaly_level,
-        "ai_watchouts": watchouts[:3],
+        "ai_watchouts": list(watchouts),
     }
 
 
@@ -483,72 +736,150 @@ def extract_risk_factors(row: sqlite3.Row) -> list[dict[str, str]]:
     return factors[:3]
 
 
-def http_get_json(url: str, params: dict[str, Any] | None = None, timeout: float = 20.0) -> Any:
-    full_url = url
-    if params:
-        full_url = f"{url}?{urlencode(params, doseq=True)}"
-    request = Request(full_url, headers={"User-Agent": USER_AGENT})
+def read_response_body(response: Any, url: str) -> bytes:
+    payload = response.read()
+    if response.headers.get("Content-Encoding") != "gzip":
+        return payload
+    try:
+        return gzip.decompress(payload)
+    except (OSError, EOFError, zlib.error) as exc:
+        raise RuntimeError(f"Invalid gzip response from {url}: {exc}") from exc
+
+
+def read_json_response(request: Request, url: str, timeout: float) -> Any:
     try:
         with urlopen(request, timeout=timeout) as response:
-            payload = response.read().decode("utf-8")
+            payload = read_response_body(response, url)
     except (HTTPError, URLError, TimeoutError) as exc:
         raise RuntimeError(f"HTTP request failed for {url}: {exc}") from exc
     try:
         return json.loads(payload)
-    except json.JSONDecodeError as exc:
+    except (json.JSONDecodeError, UnicodeDecodeError) as exc:
         raise RuntimeError(f"Invalid JSON response from {url}") from exc
 
 
+def http_get_json(url: str, params: dict[str, Any] | None = None, timeout: float = 20.0) -> Any:
+    full_url = url
+    if params:
+        full_url = f"{url}?{urlencode(params, doseq=True)}"
+    request = Request(
+        full_url,
+        headers={"User-Agent": USER_AGENT, "Accept": "application/json", "Accept-Encoding": "gzip"},
+    )
+    return read_json_response(request, url, timeout)
+
+
 def http_post_json(url: str, data: str, timeout: float = 25.0) -> Any:
     request = Request(
         url,
         data=data.encode("utf-8"),
-        headers={"User-Agent": USER_AGENT, "Content-Type": "application/x-www-form-urlencoded"},
+        headers={
+            "User-Agent": USER_AGENT,
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip",
+            "Content-Type": "application/x-www-form-urlencoded",
+        },
         method="POST",
     )
-    try:
-        with urlopen(request, timeout=timeout) as response:
-            payload = response.read().decode("utf-8")
-    except (HTTPError, URLError, TimeoutError) as exc:
-        raise RuntimeError(f"HTTP request failed for {url}: {exc}") from exc
-    try:
-        return json.loads(payload)
-    except json.JSONDecodeError as exc:
-        raise RuntimeError(f"Invalid JSON response from {url}") from exc
+    return read_json_response(request, url, timeout)
 
 
 def http_get_text(url: str, timeout: float = 20.0) -> str:
-    request = Request(url, headers={"User-Agent": USER_AGENT})
+    request = Request(url, headers={"User-Agent": USER_AGENT, "Accept-Encoding": "gzip"})
     try:
         with urlopen(request, timeout=timeout) as response:
-            return response.read().decode("utf-8", errors="replace")
+            return read_response_body(response, url).decode("utf-8", errors="replace")
     except (HTTPError, URLError, TimeoutError) as exc:
         raise RuntimeError(f"Text request failed for {url}: {exc}") from exc
 
 
+# Independent upstream lookups (map search, bed capacity) run here so their latencies overlap.
+HTTP_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="outbound-http")
+
+
+def ttl_cache(
+    ttl_seconds: float,
+    maxsize: int = 1024,
+    key: Callable[..., Any] | None = None,
+) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    # Empty results are not cached so a transient upstream outage is retried on the next request.
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        entries: dict[Any, tuple[float, Any]] = {}
+        lock = threading.Lock()
+
+        @functools.wraps(func)
+        def wrapper(*args: Any) -> Any:
+            cache_key = key(*args) if key else args
+            now = time.monotonic()
+            with lock:
+                entry = entries.get(cache_key)
+            if entry is not None and now - entry[0] < ttl_seconds:
+                return entry[1]
+
+            value = func(*args)
+            if value:
+                with lock:
+                    entries.pop(cache_key, None)
+                    if len(entries) >= maxsize:
+                        entries.pop(next(iter(entries)))
+                    entries[cache_key] = (now, value)
+            return value
+
+        wrapper.cache_clear = entries.clear  # type: ignore[attr-defined]
+        return wrapper
+
+    return decorator
+
+
+@functools.lru_cache(maxsize=4096)
 def normalize_hospital_name(name: str) -> str:
-    cleaned = re.sub(r"[^a-z0-9\\s]", " ", name.lower())
+    cleaned = HOSPITAL_NAME_STRIP_PATTERN.sub(" ", name.lower())
     tokens = [token for token in cleaned.split() if token and token not in COMMON_HOSPITAL_WORDS]
     return " ".join(tokens)
 
 
+@functools.lru_cache(maxsize=4096)
+def hospital_name_tokens(normalized_name: str) -> frozenset[str]:
+    return frozenset(normalized_name.split())
+
+
+# Cheap ceiling on name_similarity from lengths and token counts alone.
+def name_similarity_upper_bound(a: str, b: str) -> float:
+    if not a or not b:
+        return 0.0
+    a_token_count = len(hospital_name_tokens(a))
+    b_token_count = len(hospital_name_tokens(b))
+    return max(
+        2.0 * min(len(a), len(b)) / (len(a) + len(b)),
+        min(a_token_count, b_token_count) / max(a_token_count, b_token_count, 1),
+    )
+
+
 def name_similarity(a: str, b: str) -> float:
     if not a or not b:
         return 0.0
-    ratio = SequenceMatcher(None, a, b).ratio()
-    a_tokens = set(a.split())
-    b_tokens = set(b.split())
+    if a == b:
+        return 1.0
+    a_tokens = hospital_name_tokens(a)
+    b_tokens = hospital_name_tokens(b)
     overlap = len(a_tokens & b_tokens) / max(len(a_tokens | b_tokens), 1)
-    return max(ratio, overlap)
+    matcher = SequenceMatcher(None, a, b)
+    # ratio() is bounded above by the quick estimates; skip the full diff when overlap already wins.
+    if matcher.real_quick_ratio() <= overlap or matcher.quick_ratio() <= overlap:
+        return overlap
+    return max(matcher.ratio(), overlap)
 
 
 def parse_state_code(raw_state: str | None) -> str | None:
     if not raw_state:
         return None
     state = raw_state.strip().upper()
-    if len(state) == 2 and state.isalpha():
+    if state in STATE_CODES:
+        return state
+    code = STATE_TO_CODE.get(state)
+    if code is None and len(state) == 2 and state.isalpha():
         return state
-    return STATE_TO_CODE.get(state)
+    return code
 
 
 def parse_metric(value: Any) -> float | None:
@@ -577,8 +908,9 @@ def haversine_distance_km(lat1: float, lon1: float, lat2: float, lon2: float) ->
     return radius_km * c
 
 
+@ttl_cache(GEOCODE_CACHE_TTL_SECONDS)
 def parse_location_input(location: str) -> dict[str, Any]:
-    latlon_match = re.match(r"^\\s*(-?\\d+(?:\\.\\d+)?)\\s*,\\s*(-?\\d+(?:\\.\\d+)?)\\s*$", location)
+    latlon_match = LATLON_PATTERN.match(location)
     if latlon_match:
         return {
             "display_name": location,
@@ -620,8 +952,8 @@ def fetch_hospitals_from_overpass(
 ) -> list[dict[str, Any]]:
     query = (
         "[out:json][timeout:25];"
-        f"(node[\\\"amenity\\\"=\\\"hospital\\\"](around:{radius_m},{lat},{lon});"
-        f"way[\\\"amenity\\\"=\\\"hospital\\\"](around:{radius_m},{lat},{lon}););"
+        f'(node["amenity"="hospital"](around:{radius_m},{lat},{lon});'
+        f'way["amenity"="hospital"](around:{radius_m},{lat},{lon}););'
         f"out center {limit};"
     )
     response = http_post_json(OVERPASS_URL, query, timeout=35.0)
@@ -671,17 +1003,20 @@ def fetch_hospitals_from_nominatim(lat: float, lon: float, limit: int = 20) -> l
 
 
 def dedupe_hospitals(hospitals: list[dict[str, Any]]) -> list[dict[str, Any]]:
-    seen: set[str] = set()
-    unique: list[dict[str, Any]] = []
+    # ~110 m grid cells + order-insensitive name tokens; the first hospital seen in a cell is kept.
+    unique: dict[tuple[str, float, float], dict[str, Any]] = {}
     for hospital in hospitals:
-        key = f"{normalize_hospital_name(hospital['name'])}:{round(hospital['lat'], 4)}:{round(hospital['lon'], 4)}"
-        if key in seen:
-            continue
-        seen.add(key)
-        unique.append(hospital)
-    return unique
+        name_key = " ".join(sorted(set(normalize_hospital_name(hospital["name"]).split())))
+        key = (
+            name_key,
+            round(hospital["lat"], HOSPITAL_DEDUPE_GRID_DECIMALS),
+            round(hospital["lon"], HOSPITAL_DEDUPE_GRID_DECIMALS),
+        )
+        unique.setdefault(key, hospital)
+    return list(unique.values())
 
 
+@ttl_cache(NEARBY_HOSPITALS_CACHE_TTL_SECONDS, key=lambda lat, lon: (round(lat, 2), round(lon, 2)))
 def fetch_nearby_hospitals(lat: float, lon: float) -> list[dict[str, Any]]:
     hospitals: list[dict[str, Any]] = []
     for radius in (12000, 25000, 50000):
@@ -702,6 +1037,7 @@ def fetch_nearby_hospitals(lat: float, lon: float) -> list[dict[str, Any]]:
     return unique[:15]
 
 
+@ttl_cache(LATEST_WEEK_CACHE_TTL_SECONDS)
 def fetch_latest_week_for_state(state_code: str) -> str | None:
     rows = http_get_json(
         HHS_BED_DATA_URL,
@@ -720,6 +1056,13 @@ def fetch_bed_capacity(city: str | None, state_code: str | None) -> tuple[list[d
     if not latest_week:
         return [], None
 
+    city_key = " ".join(city.split()).upper() if city else None
+    return fetch_bed_capacity_rows(state_code, latest_week, city_key), latest_week
+
+
+# A closed collection week is immutable upstream, so rows are cached per (state, week, city).
+@ttl_cache(BED_CAPACITY_CACHE_TTL_SECONDS)
+def fetch_bed_capacity_rows(state_code: str, latest_week: str, city_key: str | None) -> list[dict[str, Any]]:
     fields = (
         "hospital_pk,ccn,hospital_name,city,state,collection_week,"
         "inpatient_beds_7_day_avg,inpatient_beds_used_7_day_avg,"
@@ -727,8 +1070,8 @@ def fetch_bed_capacity(city: str | None, state_code: str | None) -> tuple[list[d
     )
 
     where_parts = [f"state='{state_code}'", f"collection_week='{latest_week}'"]
-    if city:
-        safe_city = city.upper().replace("'", "''")
+    if city_key:
+        safe_city = city_key.replace("'", "''")
         where_parts.append(f"upper(city)='{safe_city}'")
 
     rows = http_get_json(
@@ -736,7 +1079,7 @@ def fetch_bed_capacity(city: str | None, state_code: str | None) -> tuple[list[d
         params={"$select": fields, "$where": " AND ".join(where_parts), "$limit": 500},
     )
 
-    if not rows and city:
+    if not rows and city_key:
         rows = http_get_json(
             HHS_BED_DATA_URL,
             params={
@@ -775,19 +1118,12 @@ def fetch_bed_capacity(city: str | None, state_code: str | None) -> tuple[list[d
             }
         )
 
-    return capacity_rows, latest_week
+    return capacity_rows
 
 
-def fetch_india_capacity_priors(city: str | None) -> tuple[list[dict[str, Any]], str]:
-    city_key = city.strip().upper() if city else None
-    rows = INDIA_HOSPITAL_CAPACITY_PRIORS
-    if city_key:
-        city_rows = [row for row in INDIA_HOSPITAL_CAPACITY_PRIORS if row["city"] == city_key]
-        if city_rows:
-            rows = city_rows
-
+def build_india_capacity_rows() -> list[dict[str, Any]]:
     prior_rows: list[dict[str, Any]] = []
-    for row in rows:
+    for row in INDIA_HOSPITAL_CAPACITY_PRIORS:
         prior_rows.append(
             {
                 "hospital_pk": row["hospital_id"],
@@ -796,13 +1132,30 @@ def fetch_india_capacity_priors(city: str | None) -> tuple[list[dict[str, Any]],
                 "normalized_name": normalize_hospital_name(row["hospital_name"]),
                 "city": row["city"],
                 "state": "IN",
-                "collection_week": "synthetic_prior_2026-02-25",
+                "collection_week": INDIA_PRIORS_COLLECTION_WEEK,
                 "available_inpatient_beds": row["available_inpatient_beds"],
                 "available_icu_beds": row["available_icu_beds"],
             }
         )
+    return prior_rows
+
+
+def index_capacity_rows_by_city(rows: list[dict[str, Any]]) -> dict[str, list[dict[str, Any]]]:
+    rows_by_city: dict[str, list[dict[str, Any]]] = {}
+    for row in rows:
+        rows_by_city.setdefault(row["city"], []).append(row)
+    return rows_by_city
+
 
-    return prior_rows, "synthetic_prior_2026-02-25"
+# The priors are static, so capacity rows and the per-city index are built once at import.
+INDIA_CAPACITY_ROWS = build_india_capacity_rows()
+INDIA_CAPACITY_ROWS_BY_CITY = index_capacity_rows_by_city(INDIA_CAPACITY_ROWS)
+
+
+def fetch_india_capacity_priors(city: str | None) -> tuple[list[dict[str, Any]], str]:
+    city_key = city.strip().upper() if city else None
+    rows = INDIA_CAPACITY_ROWS_BY_CITY.get(city_key, INDIA_CAPACITY_ROWS) if city_key else INDIA_CAPACITY_ROWS
+    return rows, INDIA_PRIORS_COLLECTION_WEEK
 
 
 def attach_travel_metrics(origin_lat: float, origin_lon: float, hospitals: list[dict[str, Any]]) -> None:
@@ -839,12 +1192,16 @@ def attach_travel_metrics(origin_lat: float, origin_lon: float, hospitals: list[
             hospital["travel_time_min"] = round((km / avg_speed_kmph) * 60, 1)
 
 
+@functools.lru_cache(maxsize=4096)
+def match_symptom_features(symptom_text: str) -> frozenset[str]:
+    return frozenset(
+        SYMPTOM_KEYWORD_TO_FEATURE[match.group(1)] for match in SYMPTOM_KEYWORD_PATTERN.finditer(symptom_text)
+    )
+
+
 def extract_symptom_flags(symptoms: list[str] | None) -> dict[str, bool]:
-    symptom_text = " ".join((symptoms or [])).lower()
-    flags: dict[str, bool] = {}
-    for feature_name, keywords in SYMPTOM_KEYWORDS.items():
-        flags[feature_name] = any(keyword in symptom_text for keyword in keywords)
-    return flags
+    matched = match_symptom_features(" ".join((symptoms or [])).lower())
+    return {feature_name: feature_name in matched for feature_name in SYMPTOM_KEYWORDS}
 
 
 def build_features(
@@ -858,33 +1215,35 @@ def build_features(
     risk_score: int,
     triage: str,
     symptoms: list[str] | None = None,
-) -> dict[str, bool]:
-    features = {
-        "risk_ge_80": risk_score >= 80,
-        "risk_60_79": 60 <= risk_score < 80,
-        "risk_40_59": 40 <= risk_score < 60,
-        "spo2_low": spo2 < 90,
-        "bp_low": systolic_bp < 90,
-        "hr_high": heart_rate > 120,
-        "hr_low": heart_rate < 50,
-        "temp_high": temperature > 38.5,
-        "temp_low": temperature < 35.0,
-        "child_u2": age <= 2,
-        "child_u5": age <= 5,
-        "pediatric": age <= 12,
-        "elderly": age >= 65,
-        "very_elderly": age >= 75,
-        "rural": rural,
-        "triage_red": triage == "RED",
-        "triage_orange": triage == "ORANGE",
-    }
-    features.update(extract_symptom_flags(symptoms))
-    return features
+    symptom_flags: dict[str, bool] | None = None,
+) -> tuple[bool, ...]:
+    if symptom_flags is None:
+        symptom_flags = extract_symptom_flags(symptoms)
+    # Same order as FEATURE_NAMES.
+    return (
+        risk_score >= 80,
+        60 <= risk_score < 80,
+        40 <= risk_score < 60,
+        spo2 < 90,
+        systolic_bp < 90,
+        heart_rate > 120,
+        heart_rate < 50,
+        temperature > 38.5,
+        temperature < 35.0,
+        age <= 2,
+        age <= 5,
+        age <= 12,
+        age >= 65,
+        age >= 75,
+        rural,
+        triage == "RED",
+        triage == "ORANGE",
+        *symptom_flags.values(),
+    )
 
 
-def collect_training_samples() -> list[dict[str, Any]]:
+def build_seed_training_samples() -> list[dict[str, Any]]:
     samples: list[dict[str, Any]] = []
-
     for row in [*SEED_OUTCOME_DATA, *SEED_OUTCOME_DATA_EXPANDED]:
         triage = triage_category(int(row["risk_score"]))
         samples.append(
@@ -900,21 +1259,36 @@ def collect_training_samples() -> list[dict[str, Any]]:
                     triage=triage,
                     symptoms=parse_symptoms_payload(row.get("symptoms")),
                 ),
-                "outcome": row["outcome"],
+                "outcome_index": MOVE_LABEL_INDEX[row["outcome"]],
             }
         )
+    return samples
 
-    status_to_outcome = {
-        "WAITING": "OBSERVATION",
-        "IN_TREATMENT": "IN_TREATMENT",
-        "REFERRED": "REFERRED",
-        "DISCHARGED": "DISCHARGED",
+
+# Seed rows never change, so their feature vectors are built once at import.
+SEED_TRAINING_SAMPLES = build_seed_training_samples()
+
+
+# Stored vitals/symptoms never change after insert (only status does), so row features are reused by id.
+TRAINING_FEATURE_CACHE: dict[int, tuple[bool, ...]] = {}
+
+
+def collect_training_samples() -> list[dict[str, Any]]:
+    global TRAINING_FEATURE_CACHE
+    samples: list[dict[str, Any]] = list(SEED_TRAINING_SAMPLES)
+
+    status_to_outcome_index = {
+        "WAITING": MOVE_LABEL_INDEX["OBSERVATION"],
+        "IN_TREATMENT": MOVE_LABEL_INDEX["IN_TREATMENT"],
+        "REFERRED": MOVE_LABEL_INDEX["REFERRED"],
+        "DISCHARGED": MOVE_LABEL_INDEX["DISCHARGED"],
     }
 
     with get_connection() as connection:
         rows = connection.execute(
             """
             SELECT
+                id,
                 age,
                 rural,
                 heart_rate,
@@ -931,30 +1305,93 @@ def collect_training_samples() -> list[dict[str, Any]]:
             """
         ).fetchall()
 
+    cached_features = TRAINING_FEATURE_CACHE
+    window_features: dict[int, tuple[bool, ...]] = {}
     for row in rows:
-        outcome = status_to_outcome.get(row["status"])
-        if outcome is None:
+        outcome_index = status_to_outcome_index.get(row["status"])
+        if outcome_index is None:
             continue
-        samples.append(
-            {
-                "features": build_features(
-                    age=int(row["age"]),
-                    rural=bool(row["rural"]),
-                    heart_rate=int(row["heart_rate"]),
-                    systolic_bp=int(row["systolic_bp"]),
-                    spo2=float(row["spo2"]),
-                    temperature=float(row["temperature"]),
-                    risk_score=int(row["risk_score"]),
-                    triage=row["triage_category"],
-                    symptoms=parse_symptoms_payload(row["symptoms_json"]),
-                ),
-                "outcome": outcome,
-            }
-        )
+        features = cached_features.get(row["id"])
+        if features is None:
+            features = build_features(
+                age=row["age"],
+                rural=bool(row["rural"]),
+                heart_rate=row["heart_rate"],
+                systolic_bp=row["systolic_bp"],
+                spo2=row["spo2"],
+                temperature=row["temperature"],
+                risk_score=row["risk_score"],
+                triage=row["triage_category"],
+                symptoms=parse_symptoms_payload(row["symptoms_json"]),
+            )
+        window_features[row["id"]] = features
+        samples.append({"features": features, "outcome_index": outcome_index})
 
+    TRAINING_FEATURE_CACHE = window_features
     return samples
 
 
+def fit_naive_bayes(samples: list[dict[str, Any]]) -> dict[str, Any]:
+    num_features = len(FEATURE_NAMES)
+    num_classes = len(MOVE_LABELS)
+    class_counts = [0] * num_classes
+    true_counts = [[0] * num_features for _ in range(num_classes)]
+
+    for sample in samples:
+        outcome_index = sample["outcome_index"]
+        class_counts[outcome_index] += 1
+        label_true_counts = true_counts[outcome_index]
+        for feature_index, feature_value in enumerate(sample["features"]):
+            if feature_value:
+                label_true_counts[feature_index] += 1
+
+    observed_samples = sum(class_counts)
+    total_samples = observed_samples or 1
+    log_priors: list[float] = []
+    # Per class, one (log P(false), log P(true)) pair per feature so a bool feature value indexes its term.
+    log_likelihoods: list[tuple[tuple[float, float], ...]] = []
+    for label_index in range(num_classes):
+        label_count = class_counts[label_index]
+        log_priors.append(math.log((label_count + 1) / (total_samples + num_classes)))
+        pairs: list[tuple[float, float]] = []
+        for true_count in true_counts[label_index]:
+            p_true = (true_count + 1) / (label_count + 2)
+            pairs.append((math.log(max(1 - p_true, 1e-9)), math.log(max(p_true, 1e-9))))
+        log_likelihoods.append(tuple(pairs))
+
+    return {
+        "observed_samples": observed_samples,
+        "log_priors": log_priors,
+        "log_likelihoods": log_likelihoods,
+        # Filled by predict_move_and_priority; dropped along with the model on the next refit.
+        "move_priority_cache": {},
+    }
+
+
+# Fitted Naive Bayes tables are reused until a triage insert or status update bumps the version.
+TRAINING_DATA_VERSION = 0
+NAIVE_BAYES_MODEL_CACHE: dict[str, Any] = {"version": None, "model": None}
+NAIVE_BAYES_MODEL_LOCK = threading.Lock()
+
+
+def bump_training_data_version() -> None:
+    global TRAINING_DATA_VERSION
+    with NAIVE_BAYES_MODEL_LOCK:
+        TRAINING_DATA_VERSION += 1
+
+
+def get_naive_bayes_model() -> dict[str, Any]:
+    version = TRAINING_DATA_VERSION
+    cached = NAIVE_BAYES_MODEL_CACHE
+    if cached["version"] == version:
+        return cached["model"]
+
+    model = fit_naive_bayes(collect_training_samples())
+    with NAIVE_BAYES_MODEL_LOCK:
+        NAIVE_BAYES_MODEL_CACHE.update(version=version, model=model)
+    return model
+
+
 def apply_clinical_probability_adjustments(
     *,
     probabilities: list[dict[str, float]],
@@ -965,8 +1402,10 @@ def apply_clinical_probability_adjustments(
     temperature: float,
     risk_score: int,
     symptoms: list[str] | None,
+    symptom_flags: dict[str, bool] | None = None,
 ) -> list[dict[str, float]]:
-    symptom_flags = extract_symptom_flags(symptoms)
+    if symptom_flags is None:
+        symptom_flags = extract_symptom_flags(symptoms)
     adjusted = {item["move"]: max(float(item["probability"]), 1e-6) for item in probabilities}
 
     if spo2 < 88 or systolic_bp < 85 or risk_score >= 85:
@@ -1035,6 +1474,116 @@ def apply_clinical_probability_adjustments(
     return normalized
 
 
+def rank_next_moves(
+    *,
+    age: int,
+    rural: bool,
+    heart_rate: int,
+    systolic_bp: int,
+    spo2: float,
+    temperature: float,
+    risk_score: int,
+    triage: str,
+    symptoms: list[str] | None,
+    model: dict[str, Any],
+) -> list[dict[str, float]]:
+    symptom_flags = extract_symptom_flags(symptoms)
+    features = build_features(
+        age=age,
+        rural=rural,
+        heart_rate=heart_rate,
+        systolic_bp=systolic_bp,
+        spo2=spo2,
+        temperature=temperature,
+        risk_score=risk_score,
+        triage=triage,
+        symptom_flags=symptom_flags,
+    )
+
+    # Scores stay in MOVE_LABELS order, so the softmax runs over plain lists.
+    log_scores = [
+        sum(map(operator.getitem, label_log_likelihoods, features), log_prior)
+        for label_log_likelihoods, log_prior in zip(model["log_likelihoods"], model["log_priors"])
+    ]
+
+    max_log_score = max(log_scores)
+    exp_scores = [math.exp(score - max_log_score) for score in log_scores]
+    denom = sum(exp_scores) or 1.0
+
+    probabilities = [
+        {"move": label, "probability": round(exp_score / denom, 4)}
+        for label, exp_score in zip(MOVE_LABELS, exp_scores)
+    ]
+    probabilities.sort(key=lambda item: item["probability"], reverse=True)
+    return apply_clinical_probability_adjustments(
+        probabilities=probabilities,
+        age=age,
+        heart_rate=heart_rate,
+        systolic_bp=systolic_bp,
+        spo2=spo2,
+        temperature=temperature,
+        risk_score=risk_score,
+        symptoms=symptoms,
+        symptom_flags=symptom_flags,
+    )
+
+
+def assign_priority(top_move: str, risk_score: int, age: int) -> str:
+    # Most urgent of the move's level and the risk band's level (risk_score // 20 picks the band).
+    rank = min(PRIORITY_RANK_BY_MOVE[top_move], PRIORITY_RANK_BY_RISK_BAND[min(max(risk_score, 0) // 20, 5)])
+
+    if rank >= 2 and (
+        (age <= 2 and risk_score >= 30) or (age <= 5 and risk_score >= 40) or (age >= 75 and risk_score >= 50)
+    ):
+        rank = 1
+    if rank == 3 and (age <= 5 or age >= 75):
+        rank = 2
+    return PRIORITY_LEVELS[rank]
+
+
+# Queue and history rows only show the top move and priority, so this skips the anomaly and trajectory work.
+def predict_move_and_priority(
+    *,
+    age: int,
+    rural: bool,
+    heart_rate: int,
+    systolic_bp: int,
+    spo2: float,
+    temperature: float,
+    risk_score: int,
+    triage: str,
+    symptoms: list[str] | None,
+    model: dict[str, Any],
+) -> tuple[str, str]:
+    if not model["observed_samples"]:
+        return "OBSERVATION", "P3 - MEDIUM"
+
+    cache = model["move_priority_cache"]
+    snapshot_key = (
+        age, rural, heart_rate, systolic_bp, spo2, temperature, risk_score, triage, tuple(symptoms or ())
+    )
+    cached = cache.get(snapshot_key)
+    if cached is not None:
+        return cached
+
+    top_move = rank_next_moves(
+        age=age,
+        rural=rural,
+        heart_rate=heart_rate,
+        systolic_bp=systolic_bp,
+        spo2=spo2,
+        temperature=temperature,
+        risk_score=risk_score,
+        triage=triage,
+        symptoms=symptoms,
+        model=model,
+    )[0]["move"]
+    result = (top_move, assign_priority(top_move, risk_score, age))
+    if len(cache) < MOVE_PRIORITY_CACHE_MAXSIZE:
+        cache[snapshot_key] = result
+    return result
+
+
 def predict_next_move(
     *,
     age: int,
@@ -1046,7 +1595,7 @@ def predict_next_move(
     risk_score: int,
     triage: str,
     symptoms: list[str] | None = None,
-    training_samples: list[dict[str, Any]] | None = None,
+    model: dict[str, Any] | None = None,
 ) -> dict[str, Any]:
     anomaly_insights = compute_anomaly_insights(
         age=age,
@@ -1055,8 +1604,9 @@ def predict_next_move(
         spo2=spo2,
         temperature=temperature,
     )
-    samples = training_samples if training_samples is not None else collect_training_samples()
-    if not samples:
+    model = model if model is not None else get_naive_bayes_model()
+    observed_samples = model["observed_samples"]
+    if not observed_samples:
         return {
             "predicted_next_move": "OBSERVATION",
             "priority": "P3 - MEDIUM",
@@ -1070,7 +1620,7 @@ def predict_next_move(
             **anomaly_insights,
         }
 
-    features = build_features(
+    probabilities = rank_next_moves(
         age=age,
         rural=rural,
         heart_rate=heart_rate,
@@ -1080,83 +1630,16 @@ def predict_next_move(
         risk_score=risk_score,
         triage=triage,
         symptoms=symptoms,
-    )
-
-    feature_names = list(features.keys())
-    class_counts = {label: 0 for label in MOVE_LABELS}
-    true_counts = {label: {feature: 0 for feature in feature_names} for label in MOVE_LABELS}
-
-    for sample in samples:
-        outcome = sample["outcome"]
-        if outcome not in MOVE_LABELS:
-            continue
-        class_counts[outcome] += 1
-        for feature_name, feature_value in sample["features"].items():
-            if feature_name in feature_names and feature_value:
-                true_counts[outcome][feature_name] += 1
-
-    observed_samples = sum(class_counts.values())
-    total_samples = observed_samples or 1
-    log_scores: dict[str, float] = {}
-    num_classes = len(MOVE_LABELS)
-
-    for label in MOVE_LABELS:
-        label_count = class_counts[label]
-        log_prob = math.log((label_count + 1) / (total_samples + num_classes))
-        for feature_name, feature_value in features.items():
-            p_true = (true_counts[label][feature_name] + 1) / (label_count + 2)
-            p_false = 1 - p_true
-            log_prob += math.log(max(p_true if feature_value else p_false, 1e-9))
-        log_scores[label] = log_prob
-
-    max_log_score = max(log_scores.values())
-    exp_scores = {label: math.exp(score - max_log_score) for label, score in log_scores.items()}
-    denom = sum(exp_scores.values()) or 1.0
-
-    probabilities = [
-        {"move": label, "probability": round(exp_scores[label] / denom, 4)} for label in MOVE_LABELS
-    ]
-    probabilities.sort(key=lambda item: item["probability"], reverse=True)
-    probabilities = apply_clinical_probability_adjustments(
-        probabilities=probabilities,
-        age=age,
-        heart_rate=heart_rate,
-        systolic_bp=systolic_bp,
-        spo2=spo2,
-        temperature=temperature,
-        risk_score=risk_score,
-        symptoms=symptoms,
+        model=model,
     )
 
     top_move = probabilities[0]["move"]
-    if top_move == "ICU_ADMISSION" or risk_score >= 80:
-        priority = "P1 - CRITICAL"
-    elif top_move in {"IN_TREATMENT", "REFERRED"} or risk_score >= 60:
-        priority = "P2 - HIGH"
-    elif top_move == "OBSERVATION" or risk_score >= 40:
-        priority = "P3 - MEDIUM"
-    else:
-        priority = "P4 - LOW"
-
-    if age <= 2 and risk_score >= 30 and priority in {"P3 - MEDIUM", "P4 - LOW"}:
-        priority = "P2 - HIGH"
-    elif age <= 5 and risk_score >= 40 and priority in {"P3 - MEDIUM", "P4 - LOW"}:
-        priority = "P2 - HIGH"
-    elif age >= 75 and risk_score >= 50 and priority in {"P3 - MEDIUM", "P4 - LOW"}:
-        priority = "P2 - HIGH"
-
-    if age <= 5 and priority == "P4 - LOW":
-        priority = "P3 - MEDIUM"
-    if age >= 75 and priority == "P4 - LOW":
-        priority = "P3 - MEDIUM"
+    priority = assign_priority(top_move, risk_score, age)
 
     top_probability = probabilities[0]["probability"] if probabilities else 0.0
+    probability_by_move = {item["move"]: item["probability"] for item in probabilities}
     critical_risk_estimate_pct = round(
-        (
-            (next((p["probability"] for p in probabilities if p["move"] == "ICU_ADMISSION"), 0.0))
-            + (next((p["probability"] for p in probabilities if p["move"] == "IN_TREATMENT"), 0.0))
-        )
-        * 100
+        (probability_by_move.get("ICU_ADMISSION", 0.0) + probability_by_move.get("IN_TREATMENT", 0.0)) * 100
     )
     confidence_band = classify_confidence(top_probability, observed_samples)
     anomaly_score = int(anomaly_insights["anomaly_score"])
@@ -1181,13 +1664,58 @@ def predict_next_move(
     }
 
 
+# next-move-prediction and clinical recommendations are usually requested together for the same patient.
+# Keying on the data version means any insert or status change misses the cache.
+@ttl_cache(LATEST_PREDICTION_CACHE_TTL_SECONDS, key=lambda patient_id: (patient_id, TRAINING_DATA_VERSION))
+def cached_latest_patient_move(patient_id: str) -> tuple[sqlite3.Row, tuple[str, ...], dict[str, Any]] | None:
+    with get_connection() as connection:
+        row = connection.execute(LATEST_PATIENT_ROW_SQL, (patient_id,)).fetchone()
+
+    if row is None:
+        return None
+
+    symptoms = parse_symptoms_payload(row["symptoms_json"])
+    prediction = predict_next_move(
+        age=row["age"],
+        rural=bool(row["rural"]),
+        heart_rate=row["heart_rate"],
+        systolic_bp=row["systolic_bp"],
+        spo2=row["spo2"],
+        temperature=row["temperature"],
+        risk_score=row["risk_score"],
+        triage=row["triage_category"],
+        symptoms=symptoms,
+    )
+    return row, tuple(symptoms), prediction
+
+
+# The cached prediction is shared across requests and threads, so each caller gets its own containers.
+def predict_latest_patient_move(patient_id: str) -> tuple[sqlite3.Row, list[str], dict[str, Any]] | None:
+    latest = cached_latest_patient_move(patient_id)
+    if latest is None:
+        return None
+
+    row, symptoms, prediction = latest
+    return (
+        row,
+        list(symptoms),
+        {
+            **prediction,
+            "probabilities": [dict(item) for item in prediction["probabilities"]],
+            "ai_watchouts": list(prediction["ai_watchouts"]),
+        },
+    )
+
+
 def build_rule_based_recommendations(
     *,
     row: sqlite3.Row,
     prediction: dict[str, Any],
+    symptoms: list[str] | None = None,
 ) -> list[str]:
     recs: list[str] = []
-    symptoms = parse_symptoms_payload(row["symptoms_json"])
+    if symptoms is None:
+        symptoms = parse_symptoms_payload(row["symptoms_json"])
     symptom_flags = extract_symptom_flags(symptoms)
 
     if row["spo2"] < 90:
@@ -1217,7 +1745,7 @@ def build_rule_based_recommendations(
         recs.append("Stabilize before transfer and keep tele-critical-care bridge active during transport.")
 
     recs.append("Repeat vitals every 15 minutes until patient status stabilizes.")
-    return dedupe_text_items(recs)[:6]
+    return dedupe_text_items(recs, limit=6)
 
 
 def fetch_ai_recommendations(prompt: str) -> list[str]:
@@ -1226,20 +1754,18 @@ def fetch_ai_recommendations(prompt: str) -> list[str]:
 
     lines = [line.strip(" -*\t") for line in response_text.splitlines() if line.strip()]
     if len(lines) <= 1:
-        lines = [segment.strip() for segment in re.split(r"[.;]\s+", response_text) if segment.strip()]
+        lines = [segment.strip() for segment in AI_SENTENCE_SPLIT_PATTERN.split(response_text) if segment.strip()]
 
     cleaned: list[str] = []
     seen: set[str] = set()
     for line in lines:
-        normalized = re.sub(r"^\d+[.)]\s*", "", " ".join(line.split()))
+        normalized = AI_LIST_PREFIX_PATTERN.sub("", " ".join(line.split()))
         if len(normalized) < 8:
             continue
         lowered = normalized.lower()
         if "sorry" in lowered and "help" in lowered:
             continue
-        if "cannot help" in lowered or "can't help" in lowered or "cant help" in lowered:
-            continue
-        if "help with that" in lowered or "as an ai" in lowered:
+        if AI_REFUSAL_PATTERN.search(lowered):
             continue
         if normalized.endswith("."):
             normalized = normalized[:-1]
@@ -1260,7 +1786,6 @@ def health() -> dict[str, str]:
 
 @app.post("/triage")
 def triage_patient(patient: PatientInput) -> dict[str, Any]:
-    validate_numeric_ranges(patient)
     cleaned_symptoms = normalize_and_validate_symptoms(patient.symptoms)
     patient_id = patient.patient_id.strip()
     if not patient_id:
@@ -1283,46 +1808,34 @@ def triage_patient(patient: PatientInput) -> dict[str, Any]:
         symptoms=cleaned_symptoms,
     )
 
-    with get_connection() as connection:
-        connection.execute(
-            """
-            INSERT INTO triage_records (
-                patient_id,
-                created_at,
-                age,
-                gender,
-                rural,
-                heart_rate,
-                systolic_bp,
-                spo2,
-                temperature,
-                symptoms_json,
-                risk_score,
-                deterioration_probability_60min,
-                triage_category,
-                action,
-                status
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                patient_id,
-                timestamp,
-                patient.age,
-                patient.gender,
-                1 if patient.rural else 0,
-                patient.vitals.heart_rate,
-                patient.vitals.systolic_bp,
-                patient.vitals.spo2,
-                patient.vitals.temperature,
-                json.dumps(cleaned_symptoms),
-                risk_score,
-                probability,
-                category,
-                action,
-                "WAITING",
-            ),
+    insert_future = insert_triage_record(
+        (
+            patient_id,
+            timestamp,
+            patient.age,
+            patient.gender,
+            1 if patient.rural else 0,
+            patient.vitals.heart_rate,
+            patient.vitals.systolic_bp,
+            patient.vitals.spo2,
+            patient.vitals.temperature,
+            json.dumps(cleaned_symptoms),
+            risk_score,
+            probability,
+            category,
+            action,
+            "WAITING",
         )
-        connection.commit()
+    )
+    try:
+        insert_future.result(timeout=TRIAGE_INSERT_TIMEOUT_SECONDS)
+    except FutureTimeoutError as exc:
+        if insert_future.cancel():
+            raise HTTPException(status_code=503, detail="Triage record could not be saved in time") from exc
+        # The writer already took the row, so report its commit rather than a failure.
+        insert_future.result()
+    except CancelledError as exc:
+        raise HTTPException(status_code=503, detail="Triage intake is shutting down") from exc
 
     return {
         "timestamp": timestamp,
@@ -1343,16 +1856,7 @@ def triage_patient(patient: PatientInput) -> dict[str, Any]:
 @app.get("/triage/explain")
 def explain_prediction(patient_id: str = Query(..., min_length=1)) -> dict[str, Any]:
     with get_connection() as connection:
-        row = connection.execute(
-            """
-            SELECT age, heart_rate, systolic_bp, spo2, temperature
-            FROM triage_records
-            WHERE patient_id = ?
-            ORDER BY id DESC
-            LIMIT 1
-            """,
-            (patient_id,),
-        ).fetchone()
+        row = connection.execute(LATEST_PATIENT_ROW_SQL, (patient_id,)).fetchone()
 
     if row is None:
         return {
@@ -1397,18 +1901,25 @@ def recommend_hospital(location: str = Query("New Delhi, India", min_length=2))
     except Exception:
         return not_found_payload
 
-    nearby_hospitals = fetch_nearby_hospitals(origin_lat, origin_lon)
+    country_code = location_info.get("country_code")
+    hospitals_future = HTTP_EXECUTOR.submit(fetch_nearby_hospitals, origin_lat, origin_lon)
+    capacity_future = None
+    if country_code in {None, "us"}:
+        capacity_future = HTTP_EXECUTOR.submit(
+            fetch_bed_capacity, location_info.get("city"), location_info.get("state_code")
+        )
+
+    nearby_hospitals = hospitals_future.result()
     if not nearby_hospitals:
         return {**not_found_payload, "resolved_location": location_info["display_name"]}
 
-    country_code = location_info.get("country_code")
     capacity_rows: list[dict[str, Any]] = []
     bed_week: str | None = None
     capacity_scope = "Map + routing only (no configured bed dataset)"
     data_sources = ["OpenStreetMap Nominatim/Overpass", "OSRM Routing"]
 
-    if country_code in {None, "us"}:
-        capacity_rows, bed_week = fetch_bed_capacity(location_info.get("city"), location_info.get("state_code"))
+    if capacity_future is not None:
+        capacity_rows, bed_week = capacity_future.result()
         capacity_scope = (
             "US HHS facility capacity dataset"
             if capacity_rows
@@ -1420,16 +1931,27 @@ def recommend_hospital(location: str = Query("New Delhi, India", min_length=2))
         capacity_scope = "India synthetic capacity priors + map/routing"
         data_sources.append("India synthetic hospital capacity priors")
 
+    capacity_by_name: dict[str, dict[str, Any]] = {}
+    for capacity_row in capacity_rows:
+        if capacity_row["normalized_name"]:
+            capacity_by_name.setdefault(capacity_row["normalized_name"], capacity_row)
+
     enriched: list[dict[str, Any]] = []
     for hospital in nearby_hospitals:
         normalized_map_name = normalize_hospital_name(hospital["name"])
-        best_match = None
-        best_score = 0.0
-        for capacity_row in capacity_rows:
-            score = name_similarity(normalized_map_name, capacity_row["normalized_name"])
-            if score > best_score:
-                best_score = score
-                best_match = capacity_row
+        best_match = capacity_by_name.get(normalized_map_name)
+        best_score = 1.0 if best_match else 0.0
+        if best_match is None:
+            for capacity_row in capacity_rows:
+                capacity_name = capacity_row["normalized_name"]
+                if name_similarity_upper_bound(normalized_map_name, capacity_name) <= best_score:
+                    continue
+                score = name_similarity(normalized_map_name, capacity_name)
+                if score > best_score:
+                    best_score = score
+                    best_match = capacity_row
+                    if best_score >= 1.0:
+                        break
 
         candidate = dict(hospital)
         candidate["match_score"] = round(best_score, 3)
@@ -1473,7 +1995,7 @@ def recommend_hospital(location: str = Query("New Delhi, India", min_length=2))
             "bed_data_scope": capacity_scope,
         }
 
-    _, best = sorted(candidates, key=lambda item: item[0], reverse=True)[0]
+    _, best = max(candidates, key=lambda item: item[0])
     recommended = {
         "hospital_id": best.get("hospital_id") or "UNKNOWN",
         "name": best["name"],
@@ -1509,8 +2031,8 @@ def recommend_hospital(location: str = Query("New Delhi, India", min_length=2))
 
 
 @app.get("/queue")
-def emergency_queue() -> dict[str, Any]:
-    training_samples = collect_training_samples()
+def emergency_queue(limit: int = Query(100, ge=1, le=100)) -> dict[str, Any]:
+    model = get_naive_bayes_model()
     with get_connection() as connection:
         rows = connection.execute(
             """
@@ -1534,23 +2056,25 @@ def emergency_queue() -> dict[str, Any]:
                 GROUP BY patient_id
             ) latest ON latest.max_id = r.id
             ORDER BY r.risk_score DESC, r.id DESC
-            LIMIT 100
-            """
+            LIMIT ?
+            """,
+            (limit,),
         ).fetchall()
 
     patients = []
     for row in rows:
-        prediction = predict_next_move(
-            age=int(row["age"]),
+        stored_symptoms = json.loads(row["symptoms_json"]) if row["symptoms_json"] else []
+        predicted_next_move, priority = predict_move_and_priority(
+            age=row["age"],
             rural=bool(row["rural"]),
-            heart_rate=int(row["heart_rate"]),
-            systolic_bp=int(row["systolic_bp"]),
-            spo2=float(row["spo2"]),
-            temperature=float(row["temperature"]),
-            risk_score=int(row["risk_score"]),
+            heart_rate=row["heart_rate"],
+            systolic_bp=row["systolic_bp"],
+            spo2=row["spo2"],
+            temperature=row["temperature"],
+            risk_score=row["risk_score"],
             triage=row["triage_category"],
-            symptoms=parse_symptoms_payload(row["symptoms_json"]),
-            training_samples=training_samples,
+            symptoms=parse_symptoms_payload(stored_symptoms),
+            model=model,
         )
         patients.append(
             {
@@ -1558,8 +2082,8 @@ def emergency_queue() -> dict[str, Any]:
                 "triage": row["triage_category"],
                 "risk_score": row["risk_score"],
                 "status": row["status"],
-                "predicted_next_move": prediction["predicted_next_move"],
-                "priority": prediction["priority"],
+                "predicted_next_move": predicted_next_move,
+                "priority": priority,
                 "age": row["age"],
                 "gender": row["gender"],
                 "rural": bool(row["rural"]),
@@ -1569,7 +2093,7 @@ def emergency_queue() -> dict[str, Any]:
                     "spo2": row["spo2"],
                     "temperature": row["temperature"],
                 },
-                "symptoms": json.loads(row["symptoms_json"]) if row["symptoms_json"] else [],
+                "symptoms": stored_symptoms,
             }
         )
 
@@ -1579,29 +2103,18 @@ def emergency_queue() -> dict[str, Any]:
 @app.patch("/queue/{patient_id}/status")
 def update_queue_status(patient_id: str, payload: QueueStatusUpdate) -> dict[str, Any]:
     with get_connection() as connection:
-        row = connection.execute(
-            """
-            SELECT id
-            FROM triage_records
-            WHERE patient_id = ?
-            ORDER BY id DESC
-            LIMIT 1
-            """,
-            (patient_id,),
-        ).fetchone()
-
-        if row is None:
-            raise HTTPException(status_code=404, detail="Patient record not found")
-
-        connection.execute(
+        cursor = connection.execute(
             """
             UPDATE triage_records
             SET status = ?
-            WHERE id = ?
+            WHERE id = (SELECT MAX(id) FROM triage_records WHERE patient_id = ?)
             """,
-            (payload.status, row["id"]),
+            (payload.status, patient_id),
         )
+        if cursor.rowcount == 0:
+            raise HTTPException(status_code=404, detail="Patient record not found")
         connection.commit()
+    bump_training_data_version()
 
     return {"patient_id": patient_id, "status": payload.status, "updated_at": utc_now_iso()}
 
@@ -1609,10 +2122,37 @@ def update_queue_status(patient_id: str, payload: QueueStatusUpdate) -> dict[str
 @app.get("/patients/{patient_id}/history")
 def patient_history(patient_id: str, limit: int = Query(10, ge=1, le=100)) -> dict[str, Any]:
     raw_limit = max(limit * 5, 50)
+    # Repeated snapshots collapse to their newest row; SQLite takes the bare columns from the MAX(id) row.
+    # Plain tuples are unpacked in the loop below instead of sqlite3.Row name lookups.
     with get_connection() as connection:
-        rows = connection.execute(
+        cursor = connection.cursor()
+        cursor.row_factory = None
+        rows = cursor.execute(
             """
+            WITH recent AS (
+                SELECT
+                    id,
+                    created_at,
+                    risk_score,
+                    deterioration_probability_60min,
+                    triage_category,
+                    action,
+                    status,
+                    gender,
+                    heart_rate,
+                    systolic_bp,
+                    spo2,
+                    temperature,
+                    age,
+                    rural,
+                    symptoms_json
+                FROM triage_records
+                WHERE patient_id = ?
+                ORDER BY id DESC
+                LIMIT ?
+            )
             SELECT
+                MAX(id) AS id,
                 created_at,
                 risk_score,
                 deterioration_probability_60min,
@@ -1626,77 +2166,84 @@ def patient_history(patient_id: str, limit: int = Query(10, ge=1, le=100)) -> di
                 temperature,
                 age,
                 rural,
+                symptoms_json,
+                (SELECT COUNT(*) FROM recent) AS raw_row_count
+            FROM recent
+            GROUP BY
+                risk_score,
+                triage_category,
+                action,
+                status,
+                heart_rate,
+                systolic_bp,
+                spo2,
+                temperature,
                 symptoms_json
-            FROM triage_records
-            WHERE patient_id = ?
             ORDER BY id DESC
             LIMIT ?
             """,
-            (patient_id, raw_limit),
+            (patient_id, raw_limit, limit),
         ).fetchall()
 
-    raw_row_count = len(rows)
     if not rows:
         raise HTTPException(status_code=404, detail="No history found for patient_id")
+    raw_row_count = rows[0][-1]
 
-    training_samples = collect_training_samples()
+    model = get_naive_bayes_model()
     history: list[dict[str, Any]] = []
-    seen_snapshots: set[tuple[Any, ...]] = set()
-    for row in rows:
-        snapshot_key = (
-            row["risk_score"],
-            row["triage_category"],
-            row["action"],
-            row["status"],
-            row["heart_rate"],
-            row["systolic_bp"],
-            row["spo2"],
-            row["temperature"],
-            row["symptoms_json"],
-        )
-        if snapshot_key in seen_snapshots:
-            continue
-        seen_snapshots.add(snapshot_key)
-
-        prediction = predict_next_move(
-            age=int(row["age"]),
-            rural=bool(row["rural"]),
-            heart_rate=int(row["heart_rate"]),
-            systolic_bp=int(row["systolic_bp"]),
-            spo2=float(row["spo2"]),
-            temperature=float(row["temperature"]),
-            risk_score=int(row["risk_score"]),
-            triage=row["triage_category"],
-            symptoms=parse_symptoms_payload(row["symptoms_json"]),
-            training_samples=training_samples,
+    for (
+        _,
+        created_at,
+        risk_score,
+        deterioration_probability,
+        triage,
+        action,
+        status,
+        gender,
+        heart_rate,
+        systolic_bp,
+        spo2,
+        temperature,
+        age,
+        rural,
+        symptoms_json,
+        _,
+    ) in rows:
+        stored_symptoms = json.loads(symptoms_json)
+        predicted_next_move, priority = predict_move_and_priority(
+            age=age,
+            rural=bool(rural),
+            heart_rate=heart_rate,
+            systolic_bp=systolic_bp,
+            spo2=spo2,
+            temperature=temperature,
+            risk_score=risk_score,
+            triage=triage,
+            symptoms=parse_symptoms_payload(stored_symptoms),
+            model=model,
         )
         history.append(
             {
-                "timestamp": row["created_at"],
-                "risk_score": row["risk_score"],
-                "deterioration_probability_60min": row["deterioration_probability_60min"],
-                "triage_category": row["triage_category"],
-                "action": row["action"],
-                "status": row["status"],
-                "age": row["age"],
-                "gender": row["gender"],
-                "rural": bool(row["rural"]),
-                "predicted_next_move": prediction["predicted_next_move"],
-                "priority": prediction["priority"],
+                "timestamp": created_at,
+                "risk_score": risk_score,
+                "deterioration_probability_60min": deterioration_probability,
+                "triage_category": triage,
+                "action": action,
+                "status": status,
+                "age": age,
+                "gender": gender,
+                "rural": bool(rural),
+                "predicted_next_move": predicted_next_move,
+                "priority": priority,
                 "vitals": {
-                    "heart_rate": row["heart_rate"],
-                    "systolic_bp": row["systolic_bp"],
-                    "spo2": row["spo2"],
-                    "temperature": row["temperature"],
+                    "heart_rate": heart_rate,
+                    "systolic_bp": systolic_bp,
+                    "spo2": spo2,
+                    "temperature": temperature,
                 },
-                "symptoms": json.loads(row["symptoms_json"]),
+                "symptoms": stored_symptoms,
             }
         )
-        if len(history) >= limit:
-            break
-
-    if not history:
-        raise HTTPException(status_code=404, detail="No history found for patient_id")
 
     latest = history[0]
     return {
@@ -1712,67 +2259,22 @@ def patient_history(patient_id: str, limit: int = Query(10, ge=1, le=100)) -> di
 
 @app.get("/patients/{patient_id}/next-move-prediction")
 def next_move_prediction(patient_id: str) -> dict[str, Any]:
-    with get_connection() as connection:
-        row = connection.execute(
-            """
-            SELECT age, rural, heart_rate, systolic_bp, spo2, temperature, risk_score, triage_category, symptoms_json
-            FROM triage_records
-            WHERE patient_id = ?
-            ORDER BY id DESC
-            LIMIT 1
-            """,
-            (patient_id,),
-        ).fetchone()
-
-    if row is None:
+    latest = predict_latest_patient_move(patient_id)
+    if latest is None:
         raise HTTPException(status_code=404, detail="Patient record not found")
 
-    prediction = predict_next_move(
-        age=int(row["age"]),
-        rural=bool(row["rural"]),
-        heart_rate=int(row["heart_rate"]),
-        systolic_bp=int(row["systolic_bp"]),
-        spo2=float(row["spo2"]),
-        temperature=float(row["temperature"]),
-        risk_score=int(row["risk_score"]),
-        triage=row["triage_category"],
-        symptoms=parse_symptoms_payload(row["symptoms_json"]),
-    )
-
+    _, _, prediction = latest
     return {"patient_id": patient_id, **prediction, "generated_at": utc_now_iso()}
 
 
 @app.get("/recommendations/clinical")
 def clinical_recommendations(patient_id: str = Query(..., min_length=1)) -> dict[str, Any]:
-    with get_connection() as connection:
-        row = connection.execute(
-            """
-            SELECT age, rural, heart_rate, systolic_bp, spo2, temperature, risk_score, triage_category, symptoms_json
-            FROM triage_records
-            WHERE patient_id = ?
-            ORDER BY id DESC
-            LIMIT 1
-            """,
-            (patient_id,),
-        ).fetchone()
-
-    if row is None:
+    latest = predict_latest_patient_move(patient_id)
+    if latest is None:
         raise HTTPException(status_code=404, detail="Patient record not found")
 
-    prediction = predict_next_move(
-        age=int(row["age"]),
-        rural=bool(row["rural"]),
-        heart_rate=int(row["heart_rate"]),
-        systolic_bp=int(row["systolic_bp"]),
-        spo2=float(row["spo2"]),
-        temperature=float(row["temperature"]),
-        risk_score=int(row["risk_score"]),
-        triage=row["triage_category"],
-        symptoms=parse_symptoms_payload(row["symptoms_json"]),
-    )
-
-    symptoms = parse_symptoms_payload(row["symptoms_json"])
-    local_recs = build_rule_based_recommendations(row=row, prediction=prediction)
+    row, symptoms, prediction = latest
+    local_recs = build_rule_based_recommendations(row=row, prediction=prediction, symptoms=symptoms)
 
     ai_recs: list[str] = []
     ai_error = None
@@ -1793,7 +2295,7 @@ def clinical_recommendations(patient_id: str = Query(..., min_length=1)) -> dict
     except RuntimeError as exc:
         ai_error = str(exc)
 
-    final_recommendations = dedupe_text_items(local_recs[:2] + ai_recs + local_recs[2:])[:4]
+    final_recommendations = dedupe_text_items(itertools.chain(local_recs[:2], ai_recs, local_recs[2:]), limit=4)
     if not final_recommendations:
         final_recommendations = local_recs[:4]
 
@@ -1809,29 +2311,92 @@ def clinical_recommendations(patient_id: str = Query(..., min_length=1)) -> dict
     }
 
 
+# Analytics covers the 5000 most recent records.
+RECENT_TRIAGE_RECORDS_CTE = """
+WITH recent AS (
+    SELECT
+        created_at,
+        risk_score,
+        deterioration_probability_60min,
+        triage_category,
+        heart_rate,
+        systolic_bp,
+        spo2,
+        temperature
+    FROM triage_records
+    ORDER BY id DESC
+    LIMIT 5000
+)
+"""
+
+
 @app.get("/analytics/summary")
 def analytics_summary() -> dict[str, Any]:
     now_utc = datetime.now(timezone.utc)
     lookback_24h = now_utc - timedelta(hours=24)
     lookback_7d = now_utc - timedelta(days=7)
 
+    since_24h = lookback_24h.isoformat()
+    since_7d = lookback_7d.isoformat()
+    bucket_starts = [lookback_24h + timedelta(hours=bucket * 3) for bucket in range(9)]
+    bucket_case = " ".join(f"WHEN created_at < ? THEN {bucket}" for bucket in range(8))
+
+    # created_at is always written by utc_now_iso(), so ISO strings compare in time order.
     with get_connection() as connection:
-        all_rows = connection.execute(
-            """
+        totals = connection.execute(
+            RECENT_TRIAGE_RECORDS_CTE
+            + """
             SELECT
-                created_at,
-                risk_score,
-                deterioration_probability_60min,
-                triage_category,
-                status,
-                heart_rate,
-                systolic_bp,
-                spo2,
-                temperature
-            FROM triage_records
-            ORDER BY id DESC
-            LIMIT 5000
-            """
+                COUNT(*) AS total,
+                SUM(risk_score) AS risk_sum,
+                COALESCE(SUM(created_at >= :since_24h), 0) AS total_24h,
+                SUM(CASE WHEN created_at >= :since_24h THEN risk_score END) AS risk_sum_24h,
+                SUM(CASE WHEN created_at >= :since_24h THEN deterioration_probability_60min END)
+                    AS deterioration_sum_24h,
+                COALESCE(SUM(created_at >= :since_24h AND triage_category IN ('RED', 'ORANGE')), 0)
+                    AS critical_24h,
+                COALESCE(SUM(created_at >= :since_24h AND spo2 < 90), 0) AS hypoxia_24h,
+                COALESCE(SUM(created_at >= :since_24h AND systolic_bp < 90), 0) AS hypotension_24h,
+                COALESCE(SUM(created_at >= :since_24h AND heart_rate > 120), 0) AS tachycardia_24h,
+                COALESCE(SUM(created_at >= :since_24h AND temperature > 38.5), 0) AS fever_24h,
+                COALESCE(SUM(triage_category = 'RED'), 0) AS RED,
+                COALESCE(SUM(triage_category = 'ORANGE'), 0) AS ORANGE,
+                COALESCE(SUM(triage_category = 'YELLOW'), 0) AS YELLOW,
+                COALESCE(SUM(triage_category = 'GREEN'), 0) AS GREEN,
+                COALESCE(SUM(created_at >= :since_24h AND triage_category = 'RED'), 0) AS RED_24h,
+                COALESCE(SUM(created_at >= :since_24h AND triage_category = 'ORANGE'), 0) AS ORANGE_24h,
+                COALESCE(SUM(created_at >= :since_24h AND triage_category = 'YELLOW'), 0) AS YELLOW_24h,
+                COALESCE(SUM(created_at >= :since_24h AND triage_category = 'GREEN'), 0) AS GREEN_24h
+            FROM recent
+            """,
+            {"since_24h": since_24h},
+        ).fetchone()
+        hourly_rows = connection.execute(
+            RECENT_TRIAGE_RECORDS_CTE
+            + f"""
+            SELECT CASE {bucket_case} END AS bucket, triage_category, COUNT(*) AS count
+            FROM recent
+            WHERE created_at >= ? AND created_at < ?
+            GROUP BY bucket, triage_category
+            """,
+            (
+                *(start.isoformat() for start in bucket_starts[1:]),
+                bucket_starts[0].isoformat(),
+                bucket_starts[-1].isoformat(),
+            ),
+        ).fetchall()
+        daily_rows = connection.execute(
+            RECENT_TRIAGE_RECORDS_CTE
+            + """
+            SELECT
+                substr(created_at, 1, 10) AS day,
+                COUNT(*) AS total,
+                SUM(triage_category IN ('RED', 'ORANGE')) AS critical
+            FROM recent
+            WHERE created_at >= ?
+            GROUP BY day
+            """,
+            (since_7d,),
         ).fetchall()
         status_rows = connection.execute(
             """
@@ -1841,66 +2406,24 @@ def analytics_summary() -> dict[str, Any]:
             """
         ).fetchall()
 
-    parsed_rows: list[dict[str, Any]] = []
-    for row in all_rows:
-        try:
-            created_at = datetime.fromisoformat(str(row["created_at"]))
-        except (TypeError, ValueError):
-            continue
-
-        if created_at.tzinfo is None:
-            created_at = created_at.replace(tzinfo=timezone.utc)
-        else:
-            created_at = created_at.astimezone(timezone.utc)
-
-        parsed_rows.append(
-            {
-                "created_at": created_at,
-                "risk_score": int(row["risk_score"]),
-                "deterioration_probability_60min": float(row["deterioration_probability_60min"]),
-                "triage_category": row["triage_category"],
-                "status": row["status"],
-                "heart_rate": int(row["heart_rate"]),
-                "systolic_bp": int(row["systolic_bp"]),
-                "spo2": float(row["spo2"]),
-                "temperature": float(row["temperature"]),
-            }
-        )
-
-    records_24h = [row for row in parsed_rows if row["created_at"] >= lookback_24h]
-    records_7d = [row for row in parsed_rows if row["created_at"] >= lookback_7d]
-
-    def triage_counter(rows: list[dict[str, Any]]) -> dict[str, int]:
-        counts = {"RED": 0, "ORANGE": 0, "YELLOW": 0, "GREEN": 0}
-        for row in rows:
-            category = row["triage_category"]
-            if category in counts:
-                counts[category] += 1
-        return counts
-
-    def average(rows: list[dict[str, Any]], field: str) -> float | None:
-        if not rows:
-            return None
-        return round(sum(float(row[field]) for row in rows) / len(rows), 1)
-
-    triage_counts = triage_counter(parsed_rows)
-    triage_counts_24h = triage_counter(records_24h)
+    triage_counts = {category: totals[category] for category in ("RED", "ORANGE", "YELLOW", "GREEN")}
+    triage_counts_24h = {category: totals[f"{category}_24h"] for category in triage_counts}
     status_counts = {row["status"]: row["count"] for row in status_rows}
 
-    critical_cases_24h = sum(
-        1 for row in records_24h if row["triage_category"] in {"RED", "ORANGE"}
-    )
+    hourly_counts = [{"RED": 0, "ORANGE": 0, "YELLOW": 0, "GREEN": 0} for _ in range(8)]
+    hourly_totals = [0] * 8
+    for row in hourly_rows:
+        hourly_totals[row["bucket"]] += row["count"]
+        if row["triage_category"] in hourly_counts[row["bucket"]]:
+            hourly_counts[row["bucket"]][row["triage_category"]] = row["count"]
 
     hourly_volume_24h: list[dict[str, Any]] = []
     for bucket in range(8):
-        start = lookback_24h + timedelta(hours=bucket * 3)
-        end = start + timedelta(hours=3)
-        bucket_rows = [row for row in records_24h if start <= row["created_at"] < end]
-        bucket_counts = triage_counter(bucket_rows)
+        bucket_counts = hourly_counts[bucket]
         hourly_volume_24h.append(
             {
-                "hour": start.strftime("%H:%M"),
-                "total": len(bucket_rows),
+                "hour": bucket_starts[bucket].strftime("%H:%M"),
+                "total": hourly_totals[bucket],
                 "red": bucket_counts["RED"],
                 "orange": bucket_counts["ORANGE"],
                 "yellow": bucket_counts["YELLOW"],
@@ -1908,59 +2431,43 @@ def analytics_summary() -> dict[str, Any]:
             }
         )
 
+    daily_by_day = {row["day"]: row for row in daily_rows}
     daily_volume_7d: list[dict[str, Any]] = []
     for offset in range(6, -1, -1):
-        day = (now_utc - timedelta(days=offset)).date()
-        day_rows = [row for row in records_7d if row["created_at"].date() == day]
-        critical_count = sum(1 for row in day_rows if row["triage_category"] in {"RED", "ORANGE"})
+        day = (now_utc - timedelta(days=offset)).date().isoformat()
+        day_row = daily_by_day.get(day)
         daily_volume_7d.append(
             {
-                "day": day.isoformat(),
-                "total": len(day_rows),
-                "critical": critical_count,
+                "day": day,
+                "total": day_row["total"] if day_row else 0,
+                "critical": day_row["critical"] if day_row else 0,
             }
         )
 
-    total_24h = len(records_24h)
+    total_records = totals["total"]
+    total_24h = totals["total_24h"]
+
+    def percent_24h(count: int) -> float:
+        return round((count / total_24h) * 100, 1) if total_24h else 0.0
+
     vitals_alert_rates_24h = {
-        "hypoxia_pct": round((sum(1 for row in records_24h if row["spo2"] < 90) / total_24h) * 100, 1)
-        if total_24h
-        else 0.0,
-        "hypotension_pct": round(
-            (sum(1 for row in records_24h if row["systolic_bp"] < 90) / total_24h) * 100, 1
-        )
-        if total_24h
-        else 0.0,
-        "tachycardia_pct": round(
-            (sum(1 for row in records_24h if row["heart_rate"] > 120) / total_24h) * 100, 1
-        )
-        if total_24h
-        else 0.0,
-        "fever_pct": round(
-            (sum(1 for row in records_24h if row["temperature"] > 38.5) / total_24h) * 100, 1
-        )
-        if total_24h
-        else 0.0,
+        "hypoxia_pct": percent_24h(totals["hypoxia_24h"]),
+        "hypotension_pct": percent_24h(totals["hypotension_24h"]),
+        "tachycardia_pct": percent_24h(totals["tachycardia_24h"]),
+        "fever_pct": percent_24h(totals["fever_24h"]),
     }
 
     return {
         "generated_at": utc_now_iso(),
-        "total_records": len(parsed_rows),
-        "total_records_24h": len(records_24h),
-        "critical_cases_24h": critical_cases_24h,
-        "average_risk_score": average(parsed_rows, "risk_score"),
-        "average_risk_score_24h": average(records_24h, "risk_score"),
-        "average_deterioration_probability_24h": round(
-            sum(row["deterioration_probability_60min"] for row in records_24h) / len(records_24h), 2
-        )
-        if records_24h
+        "total_records": total_records,
+        "total_records_24h": total_24h,
+        "critical_cases_24h": totals["critical_24h"],
+        "average_risk_score": round(totals["risk_sum"] / total_records, 1) if total_records else None,
+        "average_risk_score_24h": round(totals["risk_sum_24h"] / total_24h, 1) if total_24h else None,
+        "average_deterioration_probability_24h": round(totals["deterioration_sum_24h"] / total_24h, 2)
+        if total_24h
         else None,
-        "triage_counts": {
-            "RED": triage_counts.get("RED", 0),
-            "ORANGE": triage_counts.get("ORANGE", 0),
-            "YELLOW": triage_counts.get("YELLOW", 0),
-            "GREEN": triage_counts.get("GREEN", 0),
-        },
+        "triage_counts": triage_counts,
         "triage_counts_24h": triage_counts_24h,
         "status_counts": status_counts,
         "hourly_volume_24h": hourly_volume_24h,